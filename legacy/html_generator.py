@@ -4,8 +4,35 @@ Generates deployable HTML from tasks.json
 """
 
 import json
+import mmap
+import os
+import re
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to the stdlib encoder
+    orjson = None
+
+
+def _dumps(obj) -> bytes:
+    """Serialize obj as indented UTF-8 JSON (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+
+# Sentinels wrapping "const cards = [...];" in the template
+_CARDS_START = b'// <!--CARDS_START-->'
+_CARDS_END = b'// <!--CARDS_END-->'
+
+# Legacy fallback for templates without sentinels:
+# matches const cards = [...]; (within the initialization IIFE)
+_CARDS_PATTERN = re.compile(
+    r'(// Import cards \(only if no existing data\)\s*\n\s*)const cards\s*=\s*\n\s*\[[\s\S]*?\];'
+)
+
+
 class HTMLGenerator:
     def __init__(self, tasks: list, template_path='template.html'):
         """Initialize HTML generator with tasks"""
@@ -14,20 +41,53 @@ class HTMLGenerator:
     
     def generate(self, output_path='index.html'):
         """Generate static HTML file"""
-        # Read the current working index.html as template (not the old kanban folder)
-        with open('/root/.openclaw/workspace/python-kanban/index.html.backup', 'r') as f:
-            template = f.read()
+        # Convert tasks to UTF-8 JSON
+        tasks_json = _dumps(self.tasks)
         
-        # Convert tasks to JSON string
-        tasks_json = json.dumps(self.tasks, indent=2)
+        # Read the current working index.html as template (not the old kanban folder).
+        # With sentinels, the memory-mapped template is written to the output in
+        # pieces around the new cards, so it is never decoded or copied into memory.
+        with open('/root/.openclaw/workspace/python-kanban/index.html.backup', 'rb') as f:
+            spliced = False
+            # mmap refuses zero-length files
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as template:
+                    spliced = self._splice_cards(template, tasks_json, output_path)
+            if not spliced:
+                # No sentinels: read the file normally for the regex fallback
+                f.seek(0)
+                updated_html = self._replace_cards_legacy(
+                    f.read().decode('utf-8'), tasks_json.decode('utf-8')
+                ).encode('utf-8')
+                
+                # Write generated HTML
+                with open(output_path, 'wb') as out:
+                    out.write(updated_html)
         
-        # Replace the cards array in the template
-        # Find the line "const cards =" and replace until the closing ]
-        import re
+        print(f"✅ Generated {output_path} with {len(self.tasks)} tasks")
         
-        # Pattern to match: const cards = [...]; (within the initialization IIFE)
-        pattern = r'(// Import cards \(only if no existing data\)\s*\n\s*const cards\s*=\s*)\n\s*\[[\s\S]*?\];'
+        return output_path
+    
+    def _splice_cards(self, template: mmap.mmap, tasks_json: bytes, output_path: str) -> bool:
+        """Write the spliced template to output_path, or return False without sentinels"""
+        # Plain find, no regex scan
+        start = template.find(_CARDS_START)
+        end = template.find(_CARDS_END, start) if start != -1 else -1
+        if end == -1:
+            return False
         
+        # memoryview slices write straight from the mapping without copying it
+        with open(output_path, 'wb') as out, memoryview(template) as view:
+            out.write(view[:start + len(_CARDS_START)])
+            out.write(b'\n  const cards = ')
+            out.write(tasks_json)
+            out.write(b';\n  ')
+            out.write(view[end:])
+        return True
+    
+    def _replace_cards_legacy(self, template: str, tasks_json: str) -> str:
+        """Replace the cards array in a template that predates the sentinels"""
+        # Find the line "const cards =" and replace until the closing ]
         # Build the replacement with cards array AND localStorage save logic
         save_logic = '''
   
@@ -38,16 +98,10 @@ class HTMLGenerator:
   console.log(`✅ Imported ${cards.length} cards from embedded data`);
 })();'''
         
-        # Use a callback function to avoid regex escape issues
+        # Use a callback function to avoid regex escape issues.
+        # The cards are wrapped in the sentinels so the next run takes the fast path.
         def replace_with_cards(match):
-            return match.group(1) + '\n  ' + tasks_json + ';' + save_logic
-        
-        updated_html = re.sub(pattern, replace_with_cards, template, count=1)
+            return (match.group(1) + _CARDS_START.decode() + '\n  const cards = ' + tasks_json
+                    + ';\n  ' + _CARDS_END.decode() + save_logic)
         
-        # Write generated HTML
-        with open(output_path, 'w') as f:
-            f.write(updated_html)
-        
-        print(f"✅ Generated {output_path} with {len(self.tasks)} tasks")
-        
-        return output_path
+        return _CARDS_PATTERN.sub(replace_with_cards, template, count=1)
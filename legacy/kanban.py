@@ -14,6 +14,8 @@ BOARD_URL = "https://kanban-board-264.pages.dev"
 
 def main():
     parser = argparse.ArgumentParser(description='Kanban Board Manager')
+    parser.add_argument('--pretty', action='store_true',
+                        help='Write tasks.json indented (for debugging)')
     subparsers = parser.add_subparsers(dest='command', help='Commands')
     
     # Status command
@@ -52,7 +54,7 @@ def main():
     args = parser.parse_args()
     
     # Initialize kanban manager
-    kanban = KanbanManager()
+    kanban = KanbanManager(indent=args.pretty)
     
     if args.command == 'status':
         show_status(kanban)
@@ -123,10 +125,8 @@ def show_status(kanban):
 
 def list_tasks(kanban, column=None, priority=None):
     """List tasks with optional filters"""
-    tasks = kanban.tasks
-    
-    if column:
-        tasks = [t for t in tasks if t.get('col') == column]
+    # Column filter comes straight from the manager's per-column storage
+    tasks = kanban.get_tasks_by_column(column) if column else kanban.tasks
     
     if priority:
         tasks = [t for t in tasks if t.get('priority') == priority]
@@ -3,46 +3,218 @@ Kanban Task Manager with Supermemory Storage
 Handles CRUD operations, time tracking, and persistence
 """
 
+import bisect
+import heapq
+import itertools
 import json
 import os
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from typing import List, Dict, Optional
 from supermemory_client import SupermemoryClient
 
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to the stdlib json module
+    orjson = None
+
+try:
+    from ciso8601 import parse_datetime
+except ImportError:  # ciso8601 is optional - fall back to the stdlib parser
+    def parse_datetime(value: str) -> datetime:
+        """Parse an ISO-8601 timestamp, accepting a trailing 'Z'"""
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _loads(data: bytes):
+    """Parse JSON bytes (orjson when available)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj, indent: bool = False) -> bytes:
+    """Serialize obj as JSON bytes, compact unless indent is set (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+COLUMNS = ('backlog', 'next-up', 'progress', 'done')
+
+# Searchable Supermemory document for a task
+_CONTENT_FMT = (
+    "Task: {title}\n"
+    "ID: {id}\n"
+    "Column: {col}\n"
+    "Priority: {priority}\n"
+    "Description: {description}\n"
+    "Status: {status}"
+)
+
+# Tags shared by every synced task
+_BASE_TAGS = ('project-kanban', 'task')
+
+# Matches the SupermemoryClient connection pool size
+MIGRATE_WORKERS = 10
+
+
 class KanbanManager:
-    def __init__(self, local_file='tasks.json'):
-        """Initialize kanban manager with Supermemory backend"""
+    def __init__(self, local_file='tasks.json', indent: bool = False):
+        """
+        Initialize kanban manager with Supermemory backend
+        
+        Args:
+            local_file: Path to the tasks JSON file
+            indent: Pretty-print tasks.json (compact by default)
+        """
         self.local_file = local_file
+        self.indent = indent
         self.sm = SupermemoryClient()
-        self.tasks = []
+        # Tasks are stored per column; self.tasks is a merged view in board order
+        self._by_col: Dict[str, List[Dict]] = defaultdict(list)
+        self._by_id: Dict[int, Dict] = {}
+        self._board_pos: Dict[int, int] = {}  # id -> position in board order, keeps columns ordered
+        self._tasks_view: Optional[List[Dict]] = None
+        self._with_due: Dict[int, Dict] = {}  # id -> task, only tasks that have a dueDate
+        self._due_cache: Dict[int, tuple] = {}  # id -> (dueDate string, parsed datetime)
+        self._dirty = False
+        self._batch_depth = 0
+        self._mtime_ns: Optional[int] = None  # tasks.json mtime as of our last load/save
         self.load_tasks()
     
     def load_tasks(self):
         """Load tasks from local JSON file"""
         if os.path.exists(self.local_file):
-            with open(self.local_file, 'r') as f:
-                self.tasks = json.load(f)
+            with open(self.local_file, 'rb') as f:
+                self.tasks = _loads(f.read())
+                self._mtime_ns = os.fstat(f.fileno()).st_mtime_ns
                 print(f"✅ Loaded {len(self.tasks)} tasks from {self.local_file}")
         else:
             self.tasks = []
+            self._mtime_ns = None
             print(f"⚠️  No local tasks file found at {self.local_file}")
     
+    def reload_if_changed(self) -> bool:
+        """Reload tasks if the local JSON file changed since it was last loaded or saved"""
+        try:
+            mtime_ns = os.stat(self.local_file).st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+        if mtime_ns == self._mtime_ns:
+            return False
+        self.load_tasks()
+        return True
+    
+    @property
+    def tasks(self) -> List[Dict]:
+        """All tasks in board order, merged from the per-column storage (rebuilt after mutations)"""
+        if self._tasks_view is None:
+            # Each column is already in board order, so a k-way merge restores the full order
+            board_pos = self._board_pos
+            self._tasks_view = list(heapq.merge(
+                *self._by_col.values(), key=lambda t: board_pos[t.get('id')]
+            ))
+        return self._tasks_view
+    
+    @tasks.setter
+    def tasks(self, tasks: List[Dict]):
+        """Replace all tasks and rebuild the column and id indices"""
+        self._by_col = defaultdict(list)
+        for t in tasks:
+            self._by_col[t.get('col')].append(t)
+        self._by_id = {t.get('id'): t for t in tasks}
+        self._board_pos = {t.get('id'): i for i, t in enumerate(tasks)}
+        self._pos_seq = itertools.count(len(tasks))
+        self._with_due = {t.get('id'): t for t in tasks if t.get('dueDate')}
+        self._tasks_view = None
+        self._due_cache = {}
+        # Numeric IDs keep increasing from the current ms timestamp (or past the highest
+        # existing ID), so IDs of deleted tasks are never handed out again
+        # ("card-..." IDs come from the web UI)
+        last_id = max((t['id'] for t in tasks if isinstance(t.get('id'), int)), default=0)
+        self._id_seq = itertools.count(max(last_id + 1, int(time.time() * 1000)))
+    
+    def _parse_due_date(self, task: Dict) -> datetime:
+        """Parse task['dueDate'], reusing the last result while the string is unchanged"""
+        raw = task['dueDate']
+        cached = self._due_cache.get(task.get('id'))
+        if cached is None or cached[0] != raw:
+            cached = (raw, parse_datetime(raw))
+            self._due_cache[task.get('id')] = cached
+        return cached[1]
+    
     def save_tasks(self):
-        """Save tasks to local JSON file"""
-        with open(self.local_file, 'w') as f:
-            json.dump(self.tasks, f, indent=2)
+        """Save tasks to local JSON file (deferred while inside batch())"""
+        self._dirty = True
+        if self._batch_depth == 0:
+            self.flush()
+    
+    def flush(self):
+        """Write pending changes to the local JSON file"""
+        if not self._dirty:
+            return
+        # Serialize up front, write to a unique temp file, then swap it in atomically
+        data = _dumps(self.tasks, indent=self.indent)
+        fd, tmp_file = tempfile.mkstemp(
+            prefix=f"{os.path.basename(self.local_file)}.",
+            suffix='.tmp',
+            dir=os.path.dirname(self.local_file) or '.'
+        )
+        try:
+            # Wrap the descriptor first so it is closed whatever fails below
+            with os.fdopen(fd, 'wb') as f:
+                # mkstemp creates the file 0600; keep the existing file's permissions
+                try:
+                    os.chmod(tmp_file, os.stat(self.local_file).st_mode & 0o777)
+                except FileNotFoundError:
+                    os.chmod(tmp_file, 0o644)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            # A symlinked tasks.json is replaced by a regular file, not written through
+            os.replace(tmp_file, self.local_file)
+        except BaseException:
+            try:
+                os.unlink(tmp_file)
+            except FileNotFoundError:
+                pass
+            raise
+        self._mtime_ns = os.stat(self.local_file).st_mtime_ns
+        self._dirty = False
         print(f"💾 Saved {len(self.tasks)} tasks to {self.local_file}")
     
+    @contextmanager
+    def batch(self):
+        """
+        Group several mutations into a single save
+        
+        Usage:
+            with kanban.batch():
+                for title in titles:
+                    kanban.add_task(title)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
+    
     def get_task_by_id(self, task_id: int) -> Optional[Dict]:
         """Find task by ID"""
-        for task in self.tasks:
-            if task.get('id') == task_id:
-                return task
-        return None
+        return self._by_id.get(task_id)
     
     def get_tasks_by_column(self, column: str) -> List[Dict]:
         """Get all tasks in a specific column"""
-        return [t for t in self.tasks if t.get('col') == column]
+        return list(self._by_col.get(column, ()))
     
     def add_task(self, title: str, description: str = "", column: str = "backlog", 
                  priority: str = "med", tags: List[str] = None) -> Dict:
@@ -59,8 +231,8 @@ class KanbanManager:
         Returns:
             Created task
         """
-        # Generate unique ID (timestamp-based)
-        task_id = int(datetime.now().timestamp() * 1000)
+        # Generate unique ID (monotonic, seeded from the load time)
+        task_id = next(self._id_seq)
         
         # Create task object
         task = {
@@ -70,8 +242,8 @@ class KanbanManager:
             'col': column,
             'priority': priority,
             'tags': tags or [],
-            'created': task_id,
-            'order': len([t for t in self.tasks if t.get('col') == column]),
+            'created': int(time.time() * 1000),
+            'order': len(self._by_col[column]),
             
             # Time tracking fields
             'startTime': None,  # Set when moved to 'progress'
@@ -81,8 +253,11 @@ class KanbanManager:
             'dueDate': None
         }
         
-        # Add to local list
-        self.tasks.append(task)
+        # Add to local storage
+        self._by_col[column].append(task)
+        self._by_id[task_id] = task
+        self._board_pos[task_id] = next(self._pos_seq)
+        self._tasks_view = None
         self.save_tasks()
         
         # Store in Supermemory
@@ -111,8 +286,21 @@ class KanbanManager:
         for key, value in updates.items():
             task[key] = value
         
-        # Time tracking: set startTime when moved to 'progress'
         new_col = task.get('col')
+        if new_col != old_col:
+            self._by_col[old_col].remove(task)
+            # Keep the task's place in board order within its new column
+            column = self._by_col[new_col]
+            positions = [self._board_pos[t.get('id')] for t in column]
+            column.insert(bisect.bisect_left(positions, self._board_pos[task_id]), task)
+            self._tasks_view = None
+        
+        if task.get('dueDate'):
+            self._with_due[task_id] = task
+        else:
+            self._with_due.pop(task_id, None)
+        
+        # Time tracking: set startTime when moved to 'progress'
         if old_col != 'progress' and new_col == 'progress':
             task['startTime'] = datetime.now(timezone.utc).isoformat()
         
@@ -120,8 +308,8 @@ class KanbanManager:
         if old_col != 'done' and new_col == 'done':
             task['endTime'] = datetime.now(timezone.utc).isoformat()
             if task.get('startTime'):
-                start = datetime.fromisoformat(task['startTime'].replace('Z', '+00:00'))
-                end = datetime.fromisoformat(task['endTime'].replace('Z', '+00:00'))
+                start = parse_datetime(task['startTime'])
+                end = parse_datetime(task['endTime'])
                 hours = (end - start).total_seconds() / 3600
                 task['actualHours'] = round(hours, 2)
         
@@ -140,63 +328,67 @@ class KanbanManager:
         if not task:
             return False
         
-        self.tasks = [t for t in self.tasks if t.get('id') != task_id]
+        self._by_col[task.get('col')].remove(task)
+        del self._by_id[task_id]
+        del self._board_pos[task_id]
+        self._with_due.pop(task_id, None)
+        self._due_cache.pop(task_id, None)
+        self._tasks_view = None
         self.save_tasks()
         
         return True
     
     def get_status(self) -> Dict:
         """Get kanban board status summary"""
-        columns = {
-            'backlog': self.get_tasks_by_column('backlog'),
-            'next-up': self.get_tasks_by_column('next-up'),
-            'progress': self.get_tasks_by_column('progress'),
-            'done': self.get_tasks_by_column('done')
-        }
+        # Column counts come straight from the per-column storage
+        by_column = {col: len(self._by_col.get(col, ())) for col in COLUMNS}
         
-        # Find overdue tasks
+        # Only tasks with a due date can be overdue or due today
         now = datetime.now(timezone.utc)
+        today = now.date()
         overdue = []
         due_today = []
         
-        for task in self.tasks:
-            if task.get('dueDate'):
-                due = datetime.fromisoformat(task['dueDate'].replace('Z', '+00:00'))
-                if due < now and task.get('col') != 'done':
-                    overdue.append(task)
-                elif due.date() == now.date():
-                    due_today.append(task)
+        for task in self._with_due.values():
+            due = self._parse_due_date(task)
+            if due < now and task.get('col') != 'done':
+                overdue.append(task)
+            elif due.date() == today:
+                due_today.append(task)
         
         return {
-            'total': len(self.tasks),
-            'by_column': {col: len(tasks) for col, tasks in columns.items()},
-            'in_progress': columns['progress'],
+            'total': sum(map(len, self._by_col.values())),
+            'by_column': by_column,
+            'in_progress': list(self._by_col.get('progress', ())),
             'overdue': overdue,
             'due_today': due_today,
             'timestamp': now.isoformat()
         }
     
+    def get_report_bundle(self) -> Dict:
+        """get_status() plus the next-up task list, for reports that need both"""
+        status = self.get_status()
+        status['next_up'] = list(self._by_col.get('next-up', ()))
+        return status
+    
     def sync_task_to_supermemory(self, task: Dict):
         """Store task in Supermemory for cloud backup"""
         try:
+            col = task.get('col', 'backlog')
+            priority = task.get('priority', 'med')
+            
             # Create searchable content
-            content = f"""
-Task: {task['title']}
-ID: {task['id']}
-Column: {task.get('col', 'backlog')}
-Priority: {task.get('priority', 'med')}
-Description: {task.get('description', '')}
-Status: {self._get_task_status(task)}
-            """.strip()
+            content = _CONTENT_FMT.format_map({
+                'title': task['title'],
+                'id': task['id'],
+                'col': col,
+                'priority': priority,
+                'description': task.get('description', ''),
+                'status': self._get_task_status(task)
+            })
             
             # Generate tags
-            tags = [
-                'project-kanban',
-                'task',
-                f"col-{task.get('col', 'backlog')}",
-                f"priority-{task.get('priority', 'med')}",
-                f"task-{task['id']}"
-            ]
+            tags = [*_BASE_TAGS, f"col-{col}", f"priority-{priority}", f"task-{task['id']}"]
             
             # Add custom tags from task
             if task.get('tags'):
@@ -217,7 +409,7 @@ Status: {self._get_task_status(task)}
             return "Completed"
         elif col == 'progress':
             if task.get('startTime'):
-                start = datetime.fromisoformat(task['startTime'].replace('Z', '+00:00'))
+                start = parse_datetime(task['startTime'])
                 hours = (datetime.now(timezone.utc) - start).total_seconds() / 3600
                 return f"In progress ({round(hours, 1)}h)"
             return "In progress"
@@ -226,15 +418,20 @@ Status: {self._get_task_status(task)}
         else:
             return "Backlog"
     
-    def migrate_to_supermemory(self):
+    def migrate_to_supermemory(self, max_workers: int = MIGRATE_WORKERS):
         """Bulk migrate all existing tasks to Supermemory"""
-        print(f"🔄 Migrating {len(self.tasks)} tasks to Supermemory...")
+        total = len(self.tasks)
+        print(f"🔄 Migrating {total} tasks to Supermemory...")
         
-        for i, task in enumerate(self.tasks, 1):
-            try:
-                self.sync_task_to_supermemory(task)
-                print(f"  [{i}/{len(self.tasks)}] Synced task {task['id']}")
-            except Exception as e:
-                print(f"  ❌ Failed to sync task {task['id']}: {e}")
+        # Uploads are network-bound, so fan them out across threads
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.sync_task_to_supermemory, task): task for task in self.tasks}
+            for i, future in enumerate(as_completed(futures), 1):
+                task = futures[future]
+                try:
+                    future.result()
+                    print(f"  [{i}/{total}] Synced task {task['id']}")
+                except Exception as e:
+                    print(f"  ❌ Failed to sync task {task['id']}: {e}")
         
         print("✅ Migration complete!")
@@ -15,6 +15,18 @@ from telegram_bot import TelegramKanbanBot
 
 BOARD_URL = "https://kanban-board-264.pages.dev"
 
+# Reused across commands in the same process
+_MANAGER = None
+
+def _get_manager() -> KanbanManager:
+    """Return the shared KanbanManager, reloading tasks only if tasks.json changed"""
+    global _MANAGER
+    if _MANAGER is None:
+        _MANAGER = KanbanManager()
+    else:
+        _MANAGER.reload_if_changed()
+    return _MANAGER
+
 def handle_kanban_command(command_text: str) -> str:
     """
     Handle /kanban command from Telegram via OpenClaw
@@ -35,7 +47,7 @@ def handle_kanban_command(command_text: str) -> str:
     args = parts[1:] if len(parts) > 1 else []
     
     # Initialize manager and bot
-    kanban = KanbanManager()
+    kanban = _get_manager()
     bot = TelegramKanbanBot(kanban, BOARD_URL)
     
     # Handle command
@@ -4,11 +4,39 @@ Cloud-based semantic memory storage for AI agents
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
+from functools import lru_cache
 from datetime import datetime
+from urllib.parse import urlencode
 from typing import List, Dict, Optional
 
+try:
+    import httpx
+    import h2  # noqa: F401 - needed for httpx.Client(http2=True)
+except ImportError:  # httpx[http2] is optional - fall back to a requests.Session
+    httpx = None
+
+_HTTP_ERRORS = (requests.exceptions.RequestException,)
+if httpx is not None:
+    # httpx raises a plain ValueError on an undecodable body
+    # (requests wraps it in its own RequestException subclass)
+    _HTTP_ERRORS += (httpx.HTTPError, ValueError)
+
+KEYS_FILE = '/root/.openclaw/secrets/keys.env'
+
+
+@lru_cache(maxsize=None)
+def _read_keys_file(path: str) -> Dict[str, str]:
+    """Parse a KEY=value env file once per process"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        pairs = (line.split('=', 1) for line in f if '=' in line)
+        return {key: value.strip() for key, value in pairs}
+
+
 class SupermemoryClient:
     def __init__(self, api_key: Optional[str] = None):
         """Initialize Supermemory client with API key from env or keys.env"""
@@ -17,6 +45,20 @@ class SupermemoryClient:
         
         if not self.api_key:
             raise ValueError("SUPERMEMORY_API_KEY not found. Set environment variable or add to /root/.openclaw/secrets/keys.env")
+        
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        
+        # Reuse one connection across calls: HTTP/2 multiplexes concurrent uploads
+        # over a single TLS connection, the requests fallback keeps a keep-alive pool
+        if httpx is not None:
+            self._session = httpx.Client(http2=True, headers=headers, timeout=30.0)
+        else:
+            self._session = requests.Session()
+            self._session.headers.update(headers)
+            self._session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10))
     
     def _load_api_key(self) -> Optional[str]:
         """Load API key from environment or keys.env file"""
@@ -25,29 +67,18 @@ class SupermemoryClient:
         if key:
             return key
         
-        # Try keys.env file
-        keys_file = '/root/.openclaw/secrets/keys.env'
-        if os.path.exists(keys_file):
-            with open(keys_file, 'r') as f:
-                for line in f:
-                    if line.startswith('SUPERMEMORY_API_KEY='):
-                        return line.split('=', 1)[1].strip()
-        
-        return None
+        # Try keys.env file (parsed once and cached)
+        return _read_keys_file(KEYS_FILE).get('SUPERMEMORY_API_KEY')
     
     def _request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
         """Make authenticated API request"""
         url = f"{self.base_url}{endpoint}"
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
         
         try:
-            response = requests.request(method, url, headers=headers, json=data)
+            response = self._session.request(method, url, json=data)
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
+        except _HTTP_ERRORS as e:
             raise Exception(f"Supermemory API error: {e}")
     
     def store(self, content: str, tags: List[str] = None, space: str = 'default') -> Dict:
@@ -94,16 +125,16 @@ class SupermemoryClient:
         Returns:
             List of matching memories with scores
         """
-        params = f"?q={requests.utils.quote(query)}&limit={limit}"
+        params = {'q': query, 'limit': limit}
         
         if space and space != 'default':
-            params += f"&space={space}"
+            params['space'] = space
         
         if tags:
-            params += f"&tags={','.join(tags)}"
+            params['tags'] = ','.join(tags)
         
         try:
-            result = self._request('GET', f'/documents/search{params}')
+            result = self._request('GET', f'/documents/search?{urlencode(params)}')
             return result.get('results', result.get('documents', []))
         except Exception as e:
             # Fallback: try POST method
@@ -127,15 +158,15 @@ class SupermemoryClient:
         Returns:
             List of memories
         """
-        params = f"?limit={limit}"
+        params = {'limit': limit}
         
         if space and space != 'default':
-            params += f"&space={space}"
+            params['space'] = space
         
         if tag:
-            params += f"&tag={tag}"
+            params['tag'] = tag
         
-        result = self._request('GET', f'/documents{params}')
+        result = self._request('GET', f'/documents?{urlencode(params)}')
         return result.get('documents', result.get('memories', []))
     
     def get(self, memory_id: str) -> Dict:
@@ -3,14 +3,146 @@ Telegram Bot Integration for Kanban Board
 Handles /kanban commands for quick task management
 """
 
-from kanban_manager import KanbanManager
+import asyncio
+import bisect
+import re
+import threading
+import time
+import weakref
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from kanban_manager import COLUMNS, KanbanManager, parse_datetime
 from datetime import datetime, timezone
 
+try:
+    import httpx
+except ImportError:  # only needed for run(), the polling loop
+    httpx = None
+
+_HELP_TEXT = """
+📚 **Kanban Bot Commands**
+
+**/kanban status** - Overview of board
+**/kanban progress** - Show in-progress tasks
+**/kanban next** - Show next-up tasks
+**/kanban overdue** - Show overdue tasks
+**/kanban add "Title"** - Add task to backlog
+**/kanban move TASK-019 progress** - Move task to column
+
+**Columns:** backlog, next-up, progress, done
+
+**Example:**
+```
+/kanban add "Fix login bug"
+/kanban move 1234 progress
+```
+""".strip()
+
+_MIN_TITLE_LEN = 3
+
+_UNKNOWN_CMD = "❓ Unknown command. Use /kanban help for usage."
+
+# "1234", "TASK-1234", "task-019", ...
+_TASK_ID_RE = re.compile(r'(?:task-)?(\d+)', re.IGNORECASE)
+
+# "started ..." label by age: bisect hours into the thresholds, then divide
+# by the matching unit (hours or days) before rounding
+_AGE_THRESHOLDS = (1, 24)
+_AGE_TEMPLATES = ("started <1h ago", "started {}h ago", "started {}d ago")
+_AGE_UNITS = (None, 1, 24)
+
+_VALID_COLUMNS = frozenset(COLUMNS)
+_VALID_COLUMNS_STR = ', '.join(COLUMNS)
+
+TELEGRAM_API_URL = "https://api.telegram.org/bot{token}"
+
+# Telegram allows a bot roughly 30 outgoing messages per second
+SEND_RATE_PER_SECOND = 30
+
+# Worker threads for kanban work off the event loop; a handful is plenty
+EXECUTOR_WORKERS = 5
+
+# getUpdates returns at most 100 updates per call
+UPDATES_BATCH_SIZE = 100
+
+
+# (minute bucket, formatted time) for the status header
+_NOW_FMT_CACHE = (None, '')
+
+
+def _format_now(now: datetime) -> str:
+    """Format the status header time, calling strftime at most once per minute"""
+    global _NOW_FMT_CACHE
+    minute = int(now.timestamp() // 60)
+    if _NOW_FMT_CACHE[0] != minute:
+        _NOW_FMT_CACHE = (minute, now.strftime("%b %d, %I:%M %p"))
+    return _NOW_FMT_CACHE[1]
+
+
+# Report rendering is string work, which Numba/Cython-style compilation does not
+# help with; memoizing the per-id formatting gets the repeat-call win instead.
+@lru_cache(maxsize=4096)
+def _format_task_id_impl(task_id) -> str:
+    """Format a task ID as TASK-XXX (last 3 digits), cached across reports"""
+    return f"TASK-{str(task_id)[-3:]}"
+
+
+class _RateLimiter:
+    """Async token bucket: at most `rate` acquisitions per `period` seconds"""
+    
+    def __init__(self, rate: int, period: float = 1.0):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available, then take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                refill = (now - self._updated) * self.rate / self.period
+                self._tokens = min(self.rate, self._tokens + refill)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+
+
 class TelegramKanbanBot:
+    # command -> name of the handler method (no arguments)
+    _HANDLERS = {
+        '': 'status',
+        'status': 'status',
+        'progress': 'show_progress',
+        'overdue': 'show_overdue',
+        'next': 'show_next_up',
+        'help': 'help_text'
+    }
+    
+    # command -> (minimum number of args, handler)
+    _ARG_HANDLERS = {
+        'add': (1, lambda self, args: self.add_task(' '.join(args))),
+        'move': (2, lambda self, args: self.move_task(args[0], args[1]))
+    }
+    
     def __init__(self, kanban: KanbanManager, board_url: str):
         """Initialize Telegram bot with kanban manager"""
         self.kanban = kanban
         self.board_url = board_url
+        self._status_cache = (0.0, None)  # (monotonic time, get_report_bundle() result)
+        
+        # Async entry points (see handle_command_async)
+        # chat id -> asyncio.Lock, keeps each chat's commands in order. Weak values:
+        # a lock lives only while a command holds or waits on it, so idle chats cost nothing.
+        self._chat_locks = weakref.WeakValueDictionary()
+        self._kanban_lock = threading.Lock()  # KanbanManager is not thread-safe
+        self._send_limiter = _RateLimiter(SEND_RATE_PER_SECOND)
+        self._executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix='kanban')
+        self._inflight = {}  # (handler, generation) -> future of a running read-only command
+        self._generation = 0  # bumped whenever a command that may change the board starts
     
     def handle_command(self, command: str, args: list = None) -> str:
         """
@@ -25,133 +157,261 @@ class TelegramKanbanBot:
         """
         args = args or []
         
-        if not command or command == 'status':
-            return self.status()
-        elif command == 'progress':
-            return self.show_progress()
-        elif command == 'add' and args:
-            return self.add_task(' '.join(args))
-        elif command == 'move' and len(args) >= 2:
-            return self.move_task(args[0], args[1])
-        elif command == 'overdue':
-            return self.show_overdue()
-        elif command == 'next':
-            return self.show_next_up()
-        elif command == 'help':
-            return self.help_text()
-        else:
-            return "❓ Unknown command. Use /kanban help for usage."
+        handler = self._HANDLERS.get(command or '')
+        if handler:
+            return getattr(self, handler)()
+        
+        arg_handler = self._ARG_HANDLERS.get(command)
+        if arg_handler and len(args) >= arg_handler[0]:
+            return arg_handler[1](self, args)
+        
+        return _UNKNOWN_CMD
+    
+    async def handle_command_async(self, command: str, args: list = None, chat_id: int = None) -> str:
+        """
+        Async variant of handle_command for long-running bot processes
+        
+        Commands from one chat run in arrival order; the kanban work itself runs
+        in a worker thread so a slow command never blocks other chats.
+        """
+        async with self._chat_lock(chat_id):
+            return await self._run_command(command, args)
+    
+    def _chat_lock(self, chat_id: int) -> asyncio.Lock:
+        """Get (or create) the lock that keeps one chat's commands in order"""
+        lock = self._chat_locks.get(chat_id)
+        if lock is None:
+            lock = self._chat_locks[chat_id] = asyncio.Lock()
+        return lock
+    
+    async def _run_command(self, command: str, args: list = None) -> str:
+        """
+        Run handle_command on the bot's thread pool
+        
+        Concurrent identical read-only commands (status, progress, ...) share a
+        single in-flight run; commands that may change the board always run on
+        their own and make later reads start fresh.
+        """
+        loop = asyncio.get_running_loop()
+        handler = self._HANDLERS.get(command or '')
+        if handler is None:
+            self._generation += 1
+            return await loop.run_in_executor(self._executor, self._handle_command_locked, command, args)
+        
+        key = (handler, self._generation)
+        future = self._inflight.get(key)
+        if future is None:
+            future = loop.run_in_executor(self._executor, self._handle_command_locked, command, args)
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._inflight.pop(key, None))
+        
+        # Shield the shared future so one cancelled caller does not cancel it for the rest
+        return await asyncio.shield(future)
+    
+    def _handle_command_locked(self, command: str, args: list = None) -> str:
+        """Run handle_command while holding the kanban lock (called from worker threads)"""
+        with self._kanban_lock:
+            return self.handle_command(command, args)
+    
+    async def reply(self, send, chat_id: int, text: str):
+        """Send text via the send(chat_id, text) coroutine, respecting the bot-wide rate limit"""
+        await self._send_limiter.acquire()
+        return await send(chat_id, text)
+    
+    async def run(self, token: str, concurrency: int = 10, poll_timeout: int = 25):
+        """
+        Long-poll Telegram for /kanban commands and reply to them
+        
+        Args:
+            token: Telegram bot token
+            concurrency: Number of workers handling updates (1 = strictly sequential)
+            poll_timeout: getUpdates long-poll timeout in seconds
+        """
+        if httpx is None:
+            raise RuntimeError("httpx is required to run the polling loop (pip install httpx)")
+        
+        base_url = TELEGRAM_API_URL.format(token=token)
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async with httpx.AsyncClient(timeout=poll_timeout + 10) as client:
+            async def send(chat_id: int, text: str):
+                response = await client.post(f"{base_url}/sendMessage", json={'chat_id': chat_id, 'text': text})
+                response.raise_for_status()
+            
+            async def worker():
+                while True:
+                    update = await queue.get()
+                    try:
+                        await self._handle_update(update, send)
+                    except Exception as e:
+                        print(f"⚠️  Failed to handle update {update.get('update_id')}: {e}")
+                    finally:
+                        queue.task_done()
+            
+            workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+            offset = None
+            try:
+                while True:
+                    params = {'limit': UPDATES_BATCH_SIZE, 'timeout': poll_timeout}
+                    if offset is not None:
+                        params['offset'] = offset
+                    
+                    try:
+                        response = await client.get(f"{base_url}/getUpdates", params=params)
+                        response.raise_for_status()
+                        updates = response.json().get('result', [])
+                    except (httpx.HTTPError, ValueError) as e:  # ValueError: body is not JSON
+                        print(f"⚠️  getUpdates failed: {e}")
+                        await asyncio.sleep(1)
+                        continue
+                    
+                    for update in updates:
+                        offset = update['update_id'] + 1
+                        queue.put_nowait(update)
+            finally:
+                for task in workers:
+                    task.cancel()
+    
+    async def _handle_update(self, update: dict, send):
+        """Answer a single Telegram update if it is a /kanban command"""
+        message = update.get('message') or {}
+        words = (message.get('text') or '').split()
+        
+        # Accept both "/kanban" and "/kanban@BotName"
+        if not words or words[0].split('@', 1)[0] != '/kanban':
+            return
+        
+        command = words[1] if len(words) > 1 else 'status'
+        chat_id = message['chat']['id']
+        
+        # Hold the chat lock through the reply so responses arrive in command order
+        async with self._chat_lock(chat_id):
+            response = await self._run_command(command, words[2:])
+            await self.reply(send, chat_id, response)
     
     def status(self) -> str:
         """Get overall board status"""
-        status = self.kanban.get_status()
-        now = datetime.now(timezone.utc).strftime("%b %d, %I:%M %p")
+        status = self._get_status_cached()
+        now = datetime.now(timezone.utc)
         
-        # Count by column
-        counts = status['by_column']
+        # Bind hot lookups once
+        count = status['by_column'].get
+        in_progress = status['in_progress']
+        next_up = status['next_up']
+        overdue = status['overdue']
+        due_today = status['due_today']
+        format_task_id = self._format_task_id
         
         # Build status message
-        msg = f"📊 **Kanban Status** - {now}\n\n"
+        parts: list[str] = [f"📊 **Kanban Status** - {_format_now(now)}\n\n"]
         
         # In Progress
-        msg += f"**In Progress** ({counts.get('progress', 0)}):\n"
-        for task in status['in_progress'][:5]:  # Show first 5
-            hours = self._get_hours_in_progress(task)
-            msg += f"• {self._format_task_id(task)}: {task['title'][:50]}"
-            if hours:
-                msg += f" ({hours})"
-            msg += "\n"
+        progress_count = count('progress', 0)
+        parts.append(f"**In Progress** ({progress_count}):\n")
+        rows = [
+            (format_task_id(t), t['title'][:50], self._get_hours_in_progress(t, now))
+            for t in in_progress[:5]  # Show first 5
+        ]
+        parts.extend(
+            f"• {display_id}: {title}{f' ({hours})' if hours else ''}\n"
+            for display_id, title, hours in rows
+        )
         
-        if counts.get('progress', 0) > 5:
-            msg += f"  _...and {counts['progress'] - 5} more_\n"
+        if progress_count > 5:
+            parts.append(f"  _...and {progress_count - 5} more_\n")
         
-        msg += "\n"
+        parts.append("\n")
         
         # Next Up
-        msg += f"**Next Up** ({counts.get('next-up', 0)}):\n"
-        next_tasks = self.kanban.get_tasks_by_column('next-up')
-        for task in next_tasks[:3]:
-            msg += f"• {self._format_task_id(task)}: {task['title'][:50]}\n"
+        next_up_count = count('next-up', 0)
+        parts.append(f"**Next Up** ({next_up_count}):\n")
+        parts.extend(f"• {format_task_id(t)}: {t['title'][:50]}\n" for t in next_up[:3])
         
-        if counts.get('next-up', 0) > 3:
-            msg += f"  _...and {counts['next-up'] - 3} more_\n"
+        if next_up_count > 3:
+            parts.append(f"  _...and {next_up_count - 3} more_\n")
         
-        msg += "\n"
+        parts.append("\n")
         
         # Summary
-        msg += f"**Backlog:** {counts.get('backlog', 0)} tasks\n"
-        msg += f"**Done:** {counts.get('done', 0)} tasks\n\n"
+        parts.append(f"**Backlog:** {count('backlog', 0)} tasks\n")
+        parts.append(f"**Done:** {count('done', 0)} tasks\n\n")
         
         # Alerts
-        if status['overdue']:
-            msg += f"🔴 **Overdue:** {len(status['overdue'])} tasks\n"
+        if overdue:
+            parts.append(f"🔴 **Overdue:** {len(overdue)} tasks\n")
         
-        if status['due_today']:
-            msg += f"⚠️ **Due today:** {len(status['due_today'])} task(s)\n"
+        if due_today:
+            parts.append(f"⚠️ **Due today:** {len(due_today)} task(s)\n")
         
-        msg += f"\n🔗 View board: {self.board_url}"
+        parts.append(f"\n🔗 View board: {self.board_url}")
         
-        return msg
+        return "".join(parts)
     
     def show_progress(self) -> str:
         """Show all in-progress tasks"""
-        tasks = self.kanban.get_tasks_by_column('progress')
+        tasks = self._get_status_cached()['in_progress']
         
         if not tasks:
             return "✅ No tasks in progress"
         
-        msg = f"🚀 **In Progress** ({len(tasks)} tasks):\n\n"
-        
-        for task in tasks:
-            hours = self._get_hours_in_progress(task)
-            msg += f"**{self._format_task_id(task)}:** {task['title']}\n"
-            if hours:
-                msg += f"  ⏱ {hours}\n"
-            if task.get('priority') == 'critical':
-                msg += "  🔴 Critical\n"
-            msg += "\n"
-        
-        return msg
+        now = datetime.now(timezone.utc)
+        format_task_id = self._format_task_id
+        hours_in_progress = self._get_hours_in_progress
+        parts: list[str] = [f"🚀 **In Progress** ({len(tasks)} tasks):\n\n"]
+        
+        rows = [
+            (format_task_id(t), t['title'], hours_in_progress(t, now), t.get('priority'))
+            for t in tasks
+        ]
+        for display_id, title, hours, priority in rows:
+            hours_line = f"  ⏱ {hours}\n" if hours else ""
+            critical_line = "  🔴 Critical\n" if priority == 'critical' else ""
+            parts.append(f"**{display_id}:** {title}\n{hours_line}{critical_line}\n")
+        
+        return "".join(parts)
     
     def show_next_up(self) -> str:
         """Show next-up tasks"""
-        tasks = self.kanban.get_tasks_by_column('next-up')
+        tasks = self._get_status_cached()['next_up']
         
         if not tasks:
             return "📭 No tasks in Next Up"
         
-        msg = f"📋 **Next Up** ({len(tasks)} tasks):\n\n"
+        parts: list[str] = [f"📋 **Next Up** ({len(tasks)} tasks):\n\n"]
         
         for task in tasks:
-            msg += f"**{self._format_task_id(task)}:** {task['title']}\n"
-            if task.get('priority') in ['critical', 'high']:
-                msg += f"  Priority: {task['priority']}\n"
-            msg += "\n"
+            priority = task.get('priority')
+            priority_line = f"  Priority: {priority}\n" if priority in ['critical', 'high'] else ""
+            parts.append(f"**{self._format_task_id(task)}:** {task['title']}\n{priority_line}\n")
         
-        return msg
+        return "".join(parts)
     
     def show_overdue(self) -> str:
         """Show overdue tasks"""
-        status = self.kanban.get_status()
+        status = self._get_status_cached()
         overdue = status['overdue']
         
         if not overdue:
             return "✅ No overdue tasks!"
         
-        msg = f"🔴 **Overdue Tasks** ({len(overdue)}):\n\n"
+        now = datetime.now(timezone.utc)
+        parts: list[str] = [f"🔴 **Overdue Tasks** ({len(overdue)}):\n\n"]
         
+        format_task_id = self._format_task_id
         for task in overdue:
-            msg += f"**{self._format_task_id(task)}:** {task['title']}\n"
-            due = datetime.fromisoformat(task['dueDate'].replace('Z', '+00:00'))
-            days_overdue = (datetime.now(timezone.utc) - due).days
-            msg += f"  Due: {due.strftime('%b %d')} ({days_overdue} days ago)\n"
-            msg += f"  Column: {task.get('col', 'unknown')}\n\n"
-        
-        return msg
+            due = parse_datetime(task['dueDate'])
+            days_overdue = (now - due).days
+            parts.append(
+                f"**{format_task_id(task)}:** {task['title']}\n"
+                f"  Due: {due.strftime('%b %d')} ({days_overdue} days ago)\n"
+                f"  Column: {task.get('col', 'unknown')}\n\n"
+            )
+        
+        return "".join(parts)
     
     def add_task(self, title: str) -> str:
         """Quick add task to backlog"""
-        if not title or len(title) < 3:
+        if self._is_short(title):
             return "❌ Task title too short. Provide a meaningful title."
         
         task = self.kanban.add_task(
@@ -159,26 +419,24 @@ class TelegramKanbanBot:
             column='backlog',
             priority='med'
         )
+        self._invalidate_status()
         
         return f"✅ Added task **{self._format_task_id(task)}**: {title}"
     
     def move_task(self, task_id_str: str, column: str) -> str:
         """Move task to different column"""
         # Extract numeric ID from TASK-XXX format
-        if task_id_str.upper().startswith('TASK-'):
-            task_id_str = task_id_str[5:]
-        
-        try:
-            task_id = int(task_id_str)
-        except ValueError:
+        match = _TASK_ID_RE.fullmatch(task_id_str)
+        if not match:
             return f"❌ Invalid task ID: {task_id_str}"
+        task_id = int(match.group(1))
         
         # Validate column
-        valid_columns = ['backlog', 'next-up', 'progress', 'done']
-        if column not in valid_columns:
-            return f"❌ Invalid column. Use one of: {', '.join(valid_columns)}"
+        if column not in _VALID_COLUMNS:
+            return f"❌ Invalid column. Use one of: {_VALID_COLUMNS_STR}"
         
         task = self.kanban.move_task(task_id, column)
+        self._invalidate_status()
         if not task:
             return f"❌ Task {task_id} not found"
         
@@ -186,43 +444,39 @@ class TelegramKanbanBot:
     
     def help_text(self) -> str:
         """Show help text"""
-        return """
-📚 **Kanban Bot Commands**
-
-**/kanban status** - Overview of board
-**/kanban progress** - Show in-progress tasks
-**/kanban next** - Show next-up tasks
-**/kanban overdue** - Show overdue tasks
-**/kanban add "Title"** - Add task to backlog
-**/kanban move TASK-019 progress** - Move task to column
-
-**Columns:** backlog, next-up, progress, done
-
-**Example:**
-```
-/kanban add "Fix login bug"
-/kanban move 1234 progress
-```
-        """.strip()
+        return _HELP_TEXT
+    
+    @staticmethod
+    def _is_short(text: str) -> bool:
+        """True if text is missing or shorter than a meaningful title"""
+        return not text or len(text) < _MIN_TITLE_LEN
+    
+    def _get_status_cached(self, ttl: float = 1.0) -> dict:
+        """Return kanban.get_report_bundle(), reusing the last result for up to ttl seconds"""
+        fetched_at, status = self._status_cache
+        now = time.monotonic()
+        if status is None or now - fetched_at > ttl:
+            status = self.kanban.get_report_bundle()
+            self._status_cache = (now, status)
+        return status
+    
+    def _invalidate_status(self):
+        """Drop the cached status after the board changes"""
+        self._status_cache = (0.0, None)
     
     def _format_task_id(self, task: dict) -> str:
         """Format task ID for display (TASK-XXX)"""
-        # Use last 3 digits of ID
-        short_id = str(task['id'])[-3:]
-        return f"TASK-{short_id}"
+        return _format_task_id_impl(task['id'])
     
-    def _get_hours_in_progress(self, task: dict) -> str:
-        """Get hours since task started"""
+    def _get_hours_in_progress(self, task: dict, now: datetime = None) -> str:
+        """Get hours since task started (now can be passed in to reuse one clock read)"""
         if not task.get('startTime'):
             return None
         
-        start = datetime.fromisoformat(task['startTime'].replace('Z', '+00:00'))
-        hours = (datetime.now(timezone.utc) - start).total_seconds() / 3600
+        start = parse_datetime(task['startTime'])
+        hours = ((now or datetime.now(timezone.utc)) - start).total_seconds() / 3600
         
-        if hours < 1:
-            return "started <1h ago"
-        elif hours < 24:
-            return f"started {round(hours)}h ago"
-        else:
-            days = round(hours / 24)
-            return f"started {days}d ago"
+        idx = bisect.bisect_right(_AGE_THRESHOLDS, hours)
+        if idx == 0:
+            return _AGE_TEMPLATES[0]
+        return _AGE_TEMPLATES[idx].format(round(hours / _AGE_UNITS[idx]))